@@ -3,12 +3,18 @@
 RESTful API for managing events using Flask and MySQL (SQLAlchemy).
 """
 
+import orjson
 from os import getenv
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify
-from datetime import datetime
+from flask import Flask, Response, request
+from flask_compress import Compress
+from pydantic import ValidationError
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, object_session, raiseload
+from cache import cache
 from database import db
 from models.events import Event
+from schemas.events import EventIn, EventListIn, EventUpdate
 
 load_dotenv()
 
@@ -20,8 +26,147 @@ app.config['SQLALCHEMY_DATABASE_URI'] = getenv('SQLALCHEMY_DATABASE_URI')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = getenv(
     'SQLALCHEMY_TRACK_MODIFICATIONS'
 )
+# size the connection pool for concurrent workers and check connections
+# before use so stale ones ("server has gone away") are replaced
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 20,
+    'max_overflow': 10,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800
+}
+# set the charset at connect time instead of a SET NAMES per connection,
+# only the mysql drivers take this argument
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('mysql'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS']['connect_args'] = {
+        'charset': 'utf8mb4'
+    }
+# a second engine in autocommit mode for read-only queries, see read_session()
+app.config['SQLALCHEMY_BINDS'] = {
+    'read': {
+        'url': app.config['SQLALCHEMY_DATABASE_URI'],
+        'isolation_level': 'AUTOCOMMIT',
+        # without this sqlalchemy still sends ROLLBACK when a connection is
+        # released, even in autocommit mode (needs SQLAlchemy 2.0.43+)
+        'skip_autocommit_rollback': True,
+        **app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    }
+}
+
+# cache GET responses in redis, see events_version() for invalidation
+app.config['CACHE_TYPE'] = getenv('CACHE_TYPE', 'RedisCache')
+app.config['CACHE_REDIS_URL'] = getenv('CACHE_REDIS_URL')
+app.config['CACHE_DEFAULT_TIMEOUT'] = 60
+
+# reject request bodies over 64KB before they are read or parsed
+app.config['MAX_CONTENT_LENGTH'] = 64 * 1024
+# compress responses, event lists shrink several times over with gzip/br
+app.config['COMPRESS_MIN_SIZE'] = 512
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
 
 db.init_app(app)
+cache.init_app(app)
+Compress(app)
+
+
+def read_session():
+    """Opens a session on the autocommit engine for read-only queries.
+
+    Reads don't need a transaction. With skip_autocommit_rollback set on
+    the read bind, no ROLLBACK round trip follows every SELECT.
+    """
+    return Session(db.engines['read'])
+
+
+def events_version():
+    """Returns the current version of the events table.
+
+    Cached responses are keyed on this version, so bumping it after a write
+    invalidates all of them at once.
+    """
+    return cache.get('events:ver') or 0
+
+
+def include_description():
+    """Whether the client asked for descriptions in the events list"""
+    return 'description' in request.args.get('include', '').split(',')
+
+
+def events_cache_key():
+    """Builds the cache key for the events list"""
+    return f"events:{events_version()}:{int(include_description())}"
+
+
+def event_cache_key(event_id):
+    """Builds the cache key for a single event"""
+    return f"event:{event_id}:{events_version()}"
+
+
+def is_ok(response):
+    """Only lets successful responses into the cache"""
+    return response.status_code == 200
+
+
+def json_response(obj, status=200):
+    """Serializes obj with orjson, which is several times faster than the
+    stdlib json encoder behind jsonify"""
+    return Response(
+        orjson.dumps(obj), status=status, mimetype='application/json'
+    )
+
+
+def mark_events_changed(mapper, connection, target):
+    """Flags the session so the events version is bumped on commit"""
+    object_session(target).info['events_changed'] = True
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Event, _event_name, mark_events_changed)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def mark_bulk_events_changed(orm_execute_state):
+    """Flags bulk UPDATE and DELETE statements, which skip mapper events"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['events_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def bump_events_version(session):
+    """Invalidates cached events once a write is committed"""
+    # bumping on commit rather than on flush keeps a concurrent reader
+    # from caching uncommitted state under the new version
+    if session.info.pop('events_changed', False):
+        # the write is already committed, so a cache outage must not fail
+        # it. a missed bump only serves stale data until the timeout
+        try:
+            cache.cache.inc('events:ver')
+        except Exception:
+            app.logger.exception("Failed to invalidate the events cache")
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_events_changed(session):
+    """Drops the flag when the writes never made it to the database"""
+    session.info.pop('events_changed', None)
+
+
+@app.errorhandler(400)
+def bad_request(error):
+    """Answers malformed request bodies with JSON"""
+    return json_response({"error": "Malformed request body"}, 400)
+
+
+@app.errorhandler(413)
+def payload_too_large(error):
+    """Answers oversized request bodies with JSON"""
+    return json_response({"error": "Request body too large"}, 413)
+
+
+@app.errorhandler(415)
+def unsupported_media_type(error):
+    """Answers request bodies that aren't JSON with JSON"""
+    return json_response(
+        {"error": "Content-Type must be application/json"}, 415)
 
 
 @app.route("/", strict_slashes=False)
@@ -32,118 +177,181 @@ def index():
 @app.route("/events", methods=['POST'], strict_slashes=False)
 def create_event():
     """Creates event"""
+    # parsed outside the try block so oversized (413) and malformed (400)
+    # bodies are answered as such instead of as a 500
+    data = request.get_json()
     try:
-        data = request.get_json()
         if not data:
-            return jsonify({"error": "Invalid JSON or no data provided"}), 400
-        required_fields = ['title', 'description', 'event_date', 'location']
-        if not all(field in data for field in required_fields):
-            return jsonify({"error": f"Missing required fields: {', '.join(
-                f for f in required_fields if f not in data)}"}), 400
-        # parse event_date string into a datetime object
+            return json_response(
+                {"error": "Invalid JSON or no data provided"}, 400)
+        # checks required fields and parses event_date in one pass
         try:
-            event_date = datetime.strptime(
-                data['event_date'], '%Y-%m-%d %H:%M:%S')
-        except ValueError:
-            return jsonify(
-                {"error": "Invalid event_date format. Use YYYY-MM-DD HH:MM:SS"}
-            ), 400
-
-        new_event = Event(
-            title=data['title'],
-            description=data['description'],
-            event_date=event_date,
-            location=data['location']
+            payload = EventIn.model_validate(data)
+        except ValidationError as e:
+            return json_response({"error": e.errors(
+                include_url=False, include_context=False)}, 400)
 
-        )
+        new_event = Event(**payload.model_dump())
 
         db.session.add(new_event)
         db.session.commit()
 
-        return jsonify({
+        return json_response({
             "message": "Event created successfully",
             "event_id": new_event.id,
             "event": new_event.to_dict()
-        }), 201
+        }, 201)
+    except Exception as e:
+        db.session.rollback()
+        return json_response({"error": f"An error occured: {e}"}, 500)
+
+
+@app.route("/events/bulk", methods=['POST'], strict_slashes=False)
+def create_events_bulk():
+    """Creates many events in a single transaction"""
+    # batches legitimately need more room than a single event
+    # (per-request limits need Flask 3.1+)
+    request.max_content_length = 4 * 1024 * 1024
+    data = request.get_json()
+    try:
+        if not data or not isinstance(data, list):
+            return json_response(
+                {"error": "Invalid JSON or no list of events provided"}, 400
+            )
+        # error locations include the index of the offending event
+        try:
+            payloads = EventListIn.validate_python(data)
+        except ValidationError as e:
+            return json_response({"error": e.errors(
+                include_url=False, include_context=False)}, 400)
+        rows = [payload.model_dump() for payload in payloads]
+
+        # one INSERT and one commit for the whole batch, without building
+        # Event objects. bulk inserts skip the mapper events, so flag the
+        # cache for invalidation by hand
+        db.session.bulk_insert_mappings(Event, rows)
+        db.session.info['events_changed'] = True
+        db.session.commit()
+
+        return json_response({
+            "message": "Events created successfully",
+            "count": len(rows)
+        }, 201)
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": f"An error occured: {e}"}), 500
+        return json_response({"error": f"An error occured: {e}"}, 500)
 
 
 @app.route("/events", methods=['GET'], strict_slashes=False)
+@cache.cached(make_cache_key=events_cache_key, response_filter=is_ok)
 def get_all_events():
     """Gets all events"""
     try:
-        events = Event.query.all()
-        events_data = [event.to_dict() for event in events]
-        return jsonify({"events": events_data}), 200
+        # select plain columns instead of Event objects
+        # to skip the ORM bookkeeping for every row.
+        # plain rows can't lazy load either, so there is no N+1 risk here
+        columns = [
+            Event.id,
+            Event.title,
+            Event.event_date,
+            Event.location,
+            Event.created_at
+        ]
+        # description is a TEXT column that can be large, only fetch it
+        # when asked for with ?include=description
+        if include_description():
+            columns.insert(2, Event.description)
+        # the body has to be built in full so it can be cached, but on a
+        # miss the rows are still fetched in chunks with a server-side
+        # cursor rather than buffered by the driver next to the dicts
+        stmt = select(*columns).execution_options(yield_per=1000)
+        with read_session() as session:
+            # build each dict in one go from the row mapping, replacing
+            # the datetimes in place so the key order stays the same
+            events_data = [{
+                **row,
+                'event_date': row['event_date'].isoformat(' ', 'seconds'),
+                'created_at': row['created_at'].isoformat(' ', 'seconds')
+                if row['created_at'] else None
+            } for row in session.execute(stmt).mappings()]
+        return json_response({"events": events_data}, 200)
     except Exception as e:
-        return jsonify({"error": f"An error occured: {e}"}), 500
+        return json_response({"error": f"An error occured: {e}"}, 500)
 
 
 @app.route("/events/<int:event_id>", methods=['GET'], strict_slashes=False)
+@cache.cached(make_cache_key=event_cache_key, response_filter=is_ok)
 def get_single_event(event_id):
     """Gets single event"""
     try:
-        event = Event.query.get(event_id)
-        if event:
-            return jsonify({"event": event.to_dict()}), 200
-        else:
-            return jsonify({"message": "Event not found"}), 404
+        with read_session() as session:
+            event = session.get(Event, event_id, options=[raiseload('*')])
+            if event:
+                return json_response({"event": event.to_dict()}, 200)
+            else:
+                return json_response({"message": "Event not found"}, 404)
     except Exception as e:
-        return jsonify({"error": f"An error occured: {e}"}), 500
+        return json_response({"error": f"An error occured: {e}"}, 500)
 
 
 @app.route("/events/<int:event_id>", methods=['PUT'], strict_slashes=False)
 def update_event(event_id):
     """Updates event"""
+    data = request.get_json()
     try:
-        event = Event.query.get(event_id)
-        if not event:
-            return jsonify({"message": "Event not found"}), 404
-        data = request.get_json()
         if not data:
-            return jsonify({"error": "Invalid JSON or no data provided"}), 400
-        if 'title' in data:
-            event.title = data['title']
-        if 'description' in data:
-            event.description = data['description']
-        if 'event_date' in data:
-            try:
-                event.event_date = datetime.strptime(
-                    data['event_date'], '%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                return jsonify({"error": "Invalid event_date format. "
-                                "Use YYYY-MM-DD HH:MM:SS"}), 400
-        if 'location' in data:
-            event.location = data['location']
+            return json_response(
+                {"error": "Invalid JSON or no data provided"}, 400)
+        try:
+            payload = EventUpdate.model_validate(data)
+        except ValidationError as e:
+            return json_response({"error": e.errors(
+                include_url=False, include_context=False)}, 400)
+        # only touch the fields the client actually sent
+        updates = payload.model_dump(exclude_unset=True)
+        if updates:
+            # update in one statement instead of loading the row first.
+            # the mysql dialects count matched rows, not changed ones,
+            # so a zero row count means the event doesn't exist
+            result = db.session.execute(
+                update(Event).where(Event.id == event_id).values(**updates)
+            )
+            db.session.commit()
+            if result.rowcount == 0:
+                return json_response({"message": "Event not found"}, 404)
 
-        db.session.commit()
+        # mysql has no RETURNING, so read the updated row back
+        event = db.session.get(Event, event_id, options=[raiseload('*')])
+        if not event:
+            return json_response({"message": "Event not found"}, 404)
 
-        return jsonify({
+        return json_response({
             "message": "Event updated successfully",
             "event_id": event.id,
             "updated_event": event.to_dict()
-        }), 200
+        }, 200)
 
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": f"An error occured: {e}"}), 500
+        return json_response({"error": f"An error occured: {e}"}, 500)
 
 
 @app.route("/events/<int:event_id>", methods=['DELETE'], strict_slashes=False)
 def delete_event(event_id):
     """Deletes event"""
     try:
-        event_to_delete = Event.query.get(event_id)
-        if not event_to_delete:
-            return jsonify({"message": "event_to_delete"}), 400
-        db.session.delete(event_to_delete)
+        # delete by primary key in one statement instead of loading
+        # the row first, the row count tells us whether it existed
+        deleted = db.session.query(Event).filter(
+            Event.id == event_id
+        ).delete(synchronize_session=False)
         db.session.commit()
-        return jsonify({"message": "Event deleted successfully"}), 200
+        if deleted == 0:
+            return json_response({"message": "Event not found"}, 404)
+        return json_response({"message": "Event deleted successfully"}, 200)
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": f"An error occured: {e}"}), 500
+        return json_response({"error": f"An error occured: {e}"}, 500)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+"""Cache initialization"""
+from flask_caching import Cache
+
+cache = Cache()
@@ -7,3 +7,7 @@ CREATE TABLE events (
     location VARCHAR(255) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+-- index the date columns used for filtering and sorting
+CREATE INDEX ix_events_event_date ON events (event_date);
+CREATE INDEX ix_events_created_at ON events (created_at);
@@ -4,14 +4,23 @@ from database import db
 
 
 class Event(db.Model):
+    """Event model.
+
+    Relationships should be declared with lazy='raise' and loaded per query
+    (e.g. with selectinload) so a lazy load in a loop fails loudly instead
+    of issuing one query per event.
+    """
     __tablename__ = 'events'
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
-    event_date = db.Column(db.DateTime, nullable=False)
+    # indexed for date-range filters and sorted listings
+    event_date = db.Column(db.DateTime, nullable=False, index=True)
     location = db.Column(db.String(255), nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    created_at = db.Column(
+        db.DateTime, default=db.func.current_timestamp(), index=True
+    )
 
     def __repr__(self):
         return f'<Event {self.id}: {self.title}>'
@@ -21,10 +30,10 @@ class Event(db.Model):
             'id': self.id,
             'title': self.title,
             'description': self.description,
-            # Ensure datetime objects are formatted to string for JSON
-            'event_date': self.event_date.strftime('%Y-%m-%d %H:%M:%S')
-            if self.event_date else None,
+            # Ensure datetime objects are formatted to string for JSON.
+            # event_date is NOT NULL, so only created_at needs a guard
+            'event_date': self.event_date.isoformat(' ', 'seconds'),
             'location': self.location,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            'created_at': self.created_at.isoformat(' ', 'seconds')
             if self.created_at else None
         }
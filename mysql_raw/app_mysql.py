@@ -5,7 +5,7 @@ RESTful API for managing events using Flask and MySQL (Raw).
 
 from os import getenv
 from flask import Flask, request, jsonify
-from flask_mysqldb import MySQL
+from mysql.connector.pooling import MySQLConnectionPool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,59 +16,106 @@ app.config['MYSQL_HOST'] = getenv('MYSQL_HOST')
 app.config['MYSQL_USER'] = getenv('MYSQL_USER')
 app.config['MYSQL_PASSWORD'] = getenv('MYSQL_PASSWORD')
 app.config['MYSQL_DB'] = getenv('MYSQL_DB')
-app.config['MYSQL_CURSORCLASS'] = 'DictCursor'
+# reject request bodies over 64KB before they are read or parsed
+app.config['MAX_CONTENT_LENGTH'] = 64 * 1024
 
-mysql = MySQL(app)
+# reuse authenticated connections across requests instead of
+# sharing a single one
+pool = MySQLConnectionPool(
+    pool_name='events_pool',
+    pool_size=10,
+    autocommit=True,
+    host=app.config['MYSQL_HOST'],
+    user=app.config['MYSQL_USER'],
+    password=app.config['MYSQL_PASSWORD'],
+    database=app.config['MYSQL_DB']
+)
+
+REQUIRED_FIELDS = frozenset({'title', 'description', 'event_date', 'location'})
+
+# statements are defined once here instead of being rebuilt in every
+# request handler
+INSERT_SQL = """
+    INSERT INTO events (title, description, event_date, location)
+    VALUES (%s, %s, %s, %s)
+    """
+SELECT_ALL_SQL = "SELECT * FROM events"
+SELECT_BY_ID_SQL = "SELECT * FROM events WHERE id = %s"
+UPDATE_SQL = """
+    UPDATE events
+    SET title = %s, description = %s, event_date = %s, location = %s
+    WHERE id = %s
+    """
+# using alias here to make it easier to fetch value from key.
+# it's better/more efficient to use EXISTS here
+# since our goal is just to check whether or not an event (row) exists
+EXISTS_SQL = """
+    SELECT EXISTS (SELECT 1 FROM events WHERE id = %s)
+    AS event_to_delete
+    """
+DELETE_SQL = "DELETE FROM events WHERE id = %s"
+
+
+@app.errorhandler(400)
+def bad_request(error):
+    """Answers malformed request bodies with JSON"""
+    return jsonify({"error": "Malformed request body"}), 400
+
+
+@app.errorhandler(413)
+def payload_too_large(error):
+    """Answers oversized request bodies with JSON"""
+    return jsonify({"error": "Request body too large"}), 413
+
+
+@app.errorhandler(415)
+def unsupported_media_type(error):
+    """Answers request bodies that aren't JSON with JSON"""
+    return jsonify({"error": "Content-Type must be application/json"}), 415
 
 
 @app.route("/", strict_slashes=False)
 def index():
     """Tests database connection"""
+    conn = None
     try:
-        cursor = mysql.connection.cursor()
+        conn = pool.get_connection()
+        cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT DATABASE();")
         result = cursor.fetchone()
         cursor.close()
         return f"Database connection successful! Test query result: {result}"
     except Exception as e:
         return f"Database connection failed: {e}"
+    finally:
+        # return the connection to the pool
+        if conn:
+            conn.close()
 
 
 @app.route("/events", methods=['POST'], strict_slashes=False)
 def create_event():
     """Creates event"""
+    # parsed outside the try block so oversized (413) and malformed (400)
+    # bodies are answered as such instead of as a 500
+    data = request.get_json()
+    conn = None
     try:
-        data = request.get_json()
         if not data:
             return jsonify({"error": "Invalid JSON or no data provided"}), 400
-        if not all(
-            key in data for key in [
-                'title',
-                'description',
-                'event_date',
-                'location'
-            ]
-        ):
-            return jsonify(
-                {"error": "Missing required event fields (title, "
-                    "description, event_date, location)"}
-            ), 400
+        missing = REQUIRED_FIELDS.difference(data)
+        if missing:
+            return jsonify({"error": "Missing required event fields: "
+                            f"{', '.join(sorted(missing))}"}), 400
 
         title = data.get('title')
         description = data.get('description')
         event_date = data.get('event_date')
         location = data.get('location')
 
-        cursor = mysql.connection.cursor()
-
-        insert_query = """
-        INSERT INTO events (title, description, event_date, location)
-        VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(
-            insert_query, (title, description, event_date, location)
-        )
-        mysql.connection.commit()
+        conn = pool.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(INSERT_SQL, (title, description, event_date, location))
         new_event_id = cursor.lastrowid
         cursor.close()
 
@@ -83,32 +130,40 @@ def create_event():
             }
         }), 201
     except Exception as e:
-        mysql.connection.rollback()
         return jsonify({"error": f"An error occured: {e}"}), 500
+    finally:
+        if conn:
+            conn.close()
 
 
 @app.route("/events", methods=['GET'], strict_slashes=False)
 def get_all_events():
     """Gets all events"""
+    conn = None
     try:
-        cursor = mysql.connection.cursor()
-        cursor.execute("SELECT * FROM events")
+        conn = pool.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(SELECT_ALL_SQL)
         events = cursor.fetchall()
         cursor.close()
         return jsonify({"events": events}), 200
     except Exception as e:
         return jsonify({"error": f"An error occured: {e}"}), 500
+    finally:
+        if conn:
+            conn.close()
 
 
 @app.route("/events/<int:event_id>", methods=['GET'], strict_slashes=False)
 def get_single_event(event_id):
     """Gets single event"""
+    conn = None
     try:
-        cursor = mysql.connection.cursor()
-        select_query = "SELECT * FROM events WHERE id = %s"
+        conn = pool.get_connection()
+        cursor = conn.cursor(dictionary=True)
         # I should not forget to add ',' after 'event_id'
         # so it is treated as a tuple
-        cursor.execute(select_query, (event_id,))
+        cursor.execute(SELECT_BY_ID_SQL, (event_id,))
         event = cursor.fetchone()
         cursor.close()
         if not event:
@@ -117,22 +172,26 @@ def get_single_event(event_id):
             return jsonify({"event": event}), 200
     except Exception as e:
         return jsonify({"error": f"An error occured: {e}"}), 500
+    finally:
+        if conn:
+            conn.close()
 
 
 @app.route("/events/<int:event_id>", methods=['PUT'], strict_slashes=False)
 def update_event(event_id):
     """Updates event"""
+    data = request.get_json()
+    conn = None
     try:
         # check if event exists
-        cursor = mysql.connection.cursor()
-        select_query = "SELECT * FROM events WHERE id = %s"
-        cursor.execute(select_query, (event_id,))
+        conn = pool.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(SELECT_BY_ID_SQL, (event_id,))
         event_to_update = cursor.fetchone()
         if not event_to_update:
             cursor.close()
             return jsonify({"message": "Event not found"}), 404
         # check if data is valid
-        data = request.get_json()
         if not data:
             cursor.close()
             return jsonify({"error": "Invalid JSON or data not provided"}), 400
@@ -141,17 +200,12 @@ def update_event(event_id):
         event_date = data.get('event_date', event_to_update['event_date']
                               .strftime('%Y-%m-%d %H:%M:%S'))
         location = data.get('location', event_to_update['location'])
-        update_query = """
-        UPDATE events
-        SET title = %s, description = %s, event_date = %s, location = %s
-        WHERE id = %s;
-        """
         cursor.execute(
-            update_query, (title, description, event_date, location, event_id)
+            UPDATE_SQL, (title, description, event_date, location, event_id)
         )
-        cursor.connection.commit()
         # check for affected rows
         if cursor.rowcount == 0:
+            cursor.close()
             return jsonify({
                 "message": (
                     "No changes made to event or event not "
@@ -170,38 +224,35 @@ def update_event(event_id):
             }
         }), 200
     except Exception as e:
-        mysql.connection.rollback()
         return jsonify({"error": f"An error occured: {e}"}), 500
+    finally:
+        if conn:
+            conn.close()
 
 
 @app.route("/events/<int:event_id>", methods=['DELETE'], strict_slashes=False)
 def delete_event(event_id):
     """Deletes event"""
+    conn = None
     try:
         # we should always check if the event exists first
-        cursor = mysql.connection.cursor()
-        # using alias here to make it easier to fetch value from key.
-        # it's better/more efficient to use EXISTS here
-        # since our goal is just to check whether or not an event (row) exists
-        select_query = """
-            SELECT EXISTS (SELECT 1 FROM events WHERE id = %s)
-            AS event_to_delete
-            """
-        cursor.execute(select_query, (event_id,))
+        conn = pool.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(EXISTS_SQL, (event_id,))
         result_dict = cursor.fetchone()
         event_to_delete = result_dict.get('event_to_delete')
         if not event_to_delete:
             cursor.close()
             return jsonify({"message": "Event not found"}), 404
         # now for the deletion process
-        delete_query = "DELETE FROM events WHERE id = %s"
-        cursor.execute(delete_query, (event_id,))
-        cursor.connection.commit()
+        cursor.execute(DELETE_SQL, (event_id,))
         cursor.close()
         return jsonify({"message": "Event deleted successfully"}), 200
     except Exception as e:
-        mysql.connection.rollback()
         return jsonify({"error": f"An error occured: {e}"}), 500
+    finally:
+        if conn:
+            conn.close()
 
 
 if __name__ == "__main__":
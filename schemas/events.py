@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Request schemas for events"""
+from pydantic import BaseModel, NaiveDatetime, TypeAdapter, field_validator
+
+
+class EventIn(BaseModel):
+    """Fields required to create an event.
+
+    event_date accepts 'YYYY-MM-DD HH:MM:SS' and is parsed by pydantic-core,
+    so no strptime call happens in the request path. It must be naive, like
+    the DATETIME column it is stored in, so timestamps and values with a
+    UTC offset are rejected.
+    """
+    title: str
+    description: str | None
+    event_date: NaiveDatetime
+    location: str
+
+
+class EventUpdate(BaseModel):
+    """Fields that can be changed on an existing event"""
+    title: str | None = None
+    description: str | None = None
+    event_date: NaiveDatetime | None = None
+    location: str | None = None
+
+    @field_validator('title', 'event_date', 'location')
+    @classmethod
+    def not_null(cls, value):
+        """Fields may be left out, but only description can be set to null"""
+        if value is None:
+            raise ValueError('may not be null')
+        return value
+
+
+# validates a whole list of events in a single call for bulk creation
+EventListIn = TypeAdapter(list[EventIn])
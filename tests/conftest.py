@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Test fixtures for the SQLAlchemy app"""
+import os
+import tempfile
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# configure the app for a throwaway sqlite database and no cache before
+# it is imported, load_dotenv() does not override these
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(
+    tempfile.mkdtemp(), 'events.db')
+os.environ['CACHE_TYPE'] = 'NullCache'
+
+from app import app, db  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    with app.app_context():
+        db.create_all()
+    yield app.test_client()
+    with app.app_context():
+        db.drop_all()
+
+
+@pytest.fixture
+def count_queries():
+    """Collects every SQL statement executed on any engine"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(Engine, 'before_cursor_execute', record)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""Tests for the events API"""
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/events', '/events?include=description'])
+def test_get_all_events_query_count(client, count_queries, path):
+    """Listing events must not issue a query per event"""
+    client.post('/events/bulk', json=[{
+        'title': f'Event {i}',
+        'description': 'Description',
+        'event_date': '2024-01-01 10:00:00',
+        'location': 'Location'
+    } for i in range(20)])
+    count_queries.clear()
+
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert len(response.get_json()['events']) == 20
+    assert len(count_queries) <= 2